@@ -13,6 +13,7 @@ argument; in that case the full parser is executed.
 from __future__ import annotations
 
 import argparse
+import functools
 import glob
 import logging
 import os
@@ -1440,72 +1441,107 @@ def _parse_sketch_dependencies(sketch_path: Path) -> list[str]:
     // dependencies = ["FastLED", "ArduinoJson"]
     // SKETCH-INFO
 
+    The parsed header is memoised per sketch file; the cache key includes the
+    file's modification time and size so an edited sketch is parsed again.
+
     Args:
         sketch_path: Path to the sketch file (.ino) or directory containing sketch
 
     Returns:
         List of dependency names found in the sketch header
     """
-    dependencies = []
-
     try:
         # If it's a directory, look for .ino files
         if sketch_path.is_dir():
             ino_files = list(sketch_path.glob("*.ino"))
             if not ino_files:
-                return dependencies
+                return []
             sketch_file = ino_files[0]  # Use the first .ino file found
         else:
             sketch_file = sketch_path
 
         # Only process .ino files
         if not sketch_file.suffix.lower() == ".ino":
-            return dependencies
+            return []
 
-        # Read the first 5 lines of the sketch file
-        with open(sketch_file, "r", encoding="utf-8") as f:
-            lines = []
-            for _ in range(5):
-                try:
-                    line = next(f).strip()
-                    lines.append(line)
-                except StopIteration:
-                    break
-
-        # Look for the dependency block
-        in_dependency_block = False
-        for line in lines:
-            # Support both /// and // formats
-            if line == "/// SKETCH-INFO" or line == "// SKETCH-INFO":
-                if in_dependency_block:
-                    # Second SKETCH-INFO marker - end of block
-                    break
-                else:
-                    # First SKETCH-INFO marker - start of block
-                    in_dependency_block = True
-                    continue
-            elif in_dependency_block and (
-                line.startswith("/// dependencies = ")
-                or line.startswith("// dependencies = ")
-            ):
-                # Parse the dependencies list
-                if line.startswith("/// dependencies = "):
-                    deps_str = line[len("/// dependencies = ") :].strip()
-                else:  # line.startswith("// dependencies = ")
-                    deps_str = line[len("// dependencies = ") :].strip()
-
-                if deps_str.startswith("[") and deps_str.endswith("]"):
-                    # Simple parsing of the list format
-                    deps_str = deps_str[1:-1]  # Remove brackets
-                    for dep in deps_str.split(","):
-                        dep = dep.strip().strip('"').strip("'")
-                        if dep:
-                            dependencies.append(dep)
-                break
+        stat = sketch_file.stat()
+        return list(
+            _read_sketch_dependencies(
+                str(sketch_file.resolve()), stat.st_mtime_ns, stat.st_size
+            )
+        )
 
     except Exception as e:
         logger.debug(f"Error parsing sketch dependencies from {sketch_path}: {e}")
 
+    return []
+
+
+@functools.lru_cache(maxsize=256)
+def _read_sketch_dependencies(
+    sketch_file: str, mtime_ns: int, size: int
+) -> tuple[str, ...]:
+    """Read the SKETCH-INFO dependencies of *sketch_file*.
+
+    *mtime_ns* and *size* are not used directly; they are part of the
+    :func:`functools.lru_cache` key so that a modified file misses the cache.
+    """
+    # Read the first 5 lines of the sketch file
+    with open(sketch_file, "r", encoding="utf-8") as f:
+        lines = []
+        for _ in range(5):
+            try:
+                lines.append(next(f))
+            except StopIteration:
+                break
+
+    return tuple(_parse_sketch_dependencies_text("".join(lines)))
+
+
+# SKETCH-INFO block markers and the dependency line prefixes, in both the
+# ``///`` and ``//`` comment styles.
+_SKETCH_INFO_MARKERS = frozenset(("/// SKETCH-INFO", "// SKETCH-INFO"))
+_DEPENDENCIES_PREFIXES = ("/// dependencies = ", "// dependencies = ")
+
+
+def _parse_sketch_dependencies_text(source: str) -> list[str]:
+    """Parse the SKETCH-INFO dependencies from the text of a sketch.
+
+    Only the first 5 lines of *source* are considered, matching what
+    :func:`_parse_sketch_dependencies` reads from disk.
+    """
+    # Most sketches have no SKETCH-INFO header at all; one substring search
+    # lets them skip the line-by-line scan below.
+    if "SKETCH-INFO" not in source:
+        return []
+
+    dependencies = []
+
+    # Look for the dependency block
+    in_dependency_block = False
+    for line in source.splitlines()[:5]:
+        line = line.strip()
+        if line in _SKETCH_INFO_MARKERS:
+            if in_dependency_block:
+                # Second SKETCH-INFO marker - end of block
+                break
+            else:
+                # First SKETCH-INFO marker - start of block
+                in_dependency_block = True
+                continue
+        elif in_dependency_block and line.startswith(_DEPENDENCIES_PREFIXES):
+            # Parse the dependencies list
+            deps_str = line.partition(" = ")[2].strip()
+
+            if deps_str.startswith("[") and deps_str.endswith("]"):
+                # Simple parsing of the list format
+                deps_str = deps_str[1:-1]  # Remove brackets
+                for dep in deps_str.split(","):
+                    dep = dep.strip().strip('"').strip("'")
+                    if dep:
+                        dependencies.append(dep)
+            break
+
     return dependencies
 
 
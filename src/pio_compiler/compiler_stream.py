@@ -20,8 +20,13 @@ class CompilerStream:
     *  ``is_done`` returns *True* **once** the compilation process exited
        **and** all buffered output has been consumed.  While the build is
        ongoing or data remains in the queue the method returns *False*.
+       It does not need a :py:meth:`readline` call to observe the end of
+       output, so a plain ``while not stream.is_done()`` poll terminates.
     *  All **stderr** is redirected to **stdout** – users only deal with
        a *single* combined stream as requested.
+    *  End of output is signalled through the queue itself, so a blocking
+       :py:meth:`readline` (and ``for line in stream``) wakes up as soon as
+       the process exits instead of waiting out its timeout.
     """
 
     def __init__(
@@ -30,14 +35,19 @@ class CompilerStream:
         preloaded_output: str | None = None,
     ) -> None:
         self._popen = popen  # becomes ``None`` in *simulation* mode
-        self._queue: "Queue[str]" = Queue()
+        # ``None`` in the queue is the end-of-output marker.
+        self._queue: "Queue[str | None]" = Queue()
         # "_process_done" is *True* once the subprocess exited or when no
         # subprocess was used.  The queue may still contain data.
         self._process_done: bool = popen is None
+        # "_eof" is *True* once a reader consumed the end-of-output marker.
+        self._eof: bool = False
 
         if preloaded_output is not None:
             for line in preloaded_output.splitlines(keepends=True):
                 self._queue.put(line)
+        if popen is None:
+            self._queue.put(None)
 
         # Spawn a daemon thread that reads the subprocess' *stdout* and
         # buffers individual *lines* in the queue for later consumption.
@@ -56,18 +66,30 @@ class CompilerStream:
         finished and no more data will become available.
         """
 
+        if self._eof:
+            return None
         try:
             line = self._queue.get(timeout=timeout)
-            return line
         except Empty:
             return None
+        if line is None:
+            self._eof = True
+        return line
 
     def is_done(self) -> bool:
         """Return *True* when the build completed and no further output is pending."""
 
-        # Not done if data still in queue
-        if not self._queue.empty():
-            return False
+        if self._eof:
+            return True
+
+        # Peek at the head of the queue: pending data means not done, while
+        # an unread end-of-output marker means nothing else will arrive
+        with self._queue.mutex:
+            if self._queue.queue:
+                if self._queue.queue[0] is None:
+                    self._eof = True
+                    return True
+                return False
 
         # For subprocess-backed streams, *done* once the process finished
         return self._process_done
@@ -123,3 +145,4 @@ class CompilerStream:
                 if self._popen.stdout is not None:
                     self._popen.stdout.close()
                 self._process_done = True
+                self._queue.put(None)
@@ -35,21 +35,81 @@ Each cache entry is immutable once created and identified by:
 
 from __future__ import annotations
 
+import contextlib
+import functools
 import hashlib
 import logging
+import os
 import shutil
 import tempfile
+import threading
 import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse
 from urllib.request import urlopen
 
-from filelock import FileLock
+from filelock import FileLock, Timeout
 
 logger = logging.getLogger(__name__)
 
+# Read size used when streaming a download to disk
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Upper bound on the threads used to decompress one archive
+_MAX_EXTRACT_WORKERS = 8
+
+
+# In-process locks keyed by lock file path, shared by every manager in the
+# process, see GlobalCacheManager._hold_lock()
+_INPROC_LOCKS: Dict[str, threading.Lock] = {}
+_INPROC_LOCKS_GUARD = threading.Lock()
+
+
+def _inproc_lock(lock_path: Path) -> threading.Lock:
+    """Return the process-wide mutex that guards *lock_path*."""
+    key = os.path.abspath(lock_path)
+    with _INPROC_LOCKS_GUARD:
+        return _INPROC_LOCKS.setdefault(key, threading.Lock())
+
+
+@functools.lru_cache(maxsize=1024)
+def _url_hash(url: str) -> str:
+    """Return the first 8 hex digits of the SHA-256 of *url*.
+
+    The digest names entries on disk, so the algorithm must not change
+    without invalidating every existing cache entry.
+    """
+    return hashlib.sha256(url.encode()).hexdigest()[:8]
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_github_url(github_url: str) -> Tuple[str, str, str]:
+    """Split *github_url* into (domain, owner, repo_name).
+
+    Backs :meth:`GlobalCacheManager._parse_github_url`.
+    """
+    parsed = urlparse(github_url)
+    if not parsed.netloc:
+        raise ValueError(f"Invalid GitHub URL: {github_url}")
+
+    domain = parsed.netloc
+    path_parts = parsed.path.strip("/").split("/")
+
+    if len(path_parts) < 2:
+        raise ValueError(f"Invalid GitHub URL format: {github_url}")
+
+    owner = path_parts[0]
+    repo_name = path_parts[1]
+
+    # Remove .git suffix if present
+    if repo_name.endswith(".git"):
+        repo_name = repo_name[:-4]
+
+    return domain, owner, repo_name
+
 
 class GlobalCacheManager:
     """Manages the global immutable cache for framework dependencies."""
@@ -66,6 +126,35 @@ class GlobalCacheManager:
         self.cache_root = cache_root
         self.cache_root.mkdir(parents=True, exist_ok=True)
 
+    @contextlib.contextmanager
+    def _hold_lock(self, lock_path: Path, timeout: float) -> Iterator[None]:
+        """Hold *lock_path* against other threads and other processes.
+
+        Threads of this process first queue on a ``threading.Lock`` shared
+        by every manager instance, so only one of them at a time takes the
+        ``FileLock`` and the others wait on the mutex instead of repeatedly
+        polling the lock file.
+
+        Args:
+            lock_path: Path to the lock file
+            timeout: Seconds to wait for both locks together
+
+        Raises:
+            Timeout: If the locks cannot be acquired in time
+        """
+        deadline = time.monotonic() + timeout
+        inproc_lock = _inproc_lock(lock_path)
+        if not inproc_lock.acquire(timeout=timeout):
+            raise Timeout(str(lock_path))
+        try:
+            # Only the time left may go to the file lock; a negative timeout
+            # would make FileLock block forever, 0 means a single attempt
+            remaining = max(0.0, deadline - time.monotonic())
+            with FileLock(lock_path, timeout=remaining):
+                yield
+        finally:
+            inproc_lock.release()
+
     def _parse_github_url(self, github_url: str) -> Tuple[str, str, str]:
         """Parse a GitHub URL to extract domain, owner, and repo name.
 
@@ -78,24 +167,7 @@ class GlobalCacheManager:
         Raises:
             ValueError: If URL is not a valid GitHub URL
         """
-        parsed = urlparse(github_url)
-        if not parsed.netloc:
-            raise ValueError(f"Invalid GitHub URL: {github_url}")
-
-        domain = parsed.netloc
-        path_parts = parsed.path.strip("/").split("/")
-
-        if len(path_parts) < 2:
-            raise ValueError(f"Invalid GitHub URL format: {github_url}")
-
-        owner = path_parts[0]
-        repo_name = path_parts[1]
-
-        # Remove .git suffix if present
-        if repo_name.endswith(".git"):
-            repo_name = repo_name[:-4]
-
-        return domain, owner, repo_name
+        return _parse_github_url(github_url)
 
     def _get_cache_paths(
         self, github_url: str, branch_name: str, commit_hash: str
@@ -135,8 +207,7 @@ class GlobalCacheManager:
         # For now, we'll use a hash of the URL as a proxy for the commit hash
         # In a real implementation, you might want to query the GitHub API
         # to get the actual commit hash for the branch/tag
-        url_hash = hashlib.sha256(zip_url.encode()).hexdigest()
-        return url_hash[:8]
+        return _url_hash(zip_url)
 
     def _download_archive(self, zip_url: str, archive_path: Path) -> None:
         """Download a zip file to the archive path.
@@ -161,7 +232,8 @@ class GlobalCacheManager:
             ) as temp_file:
                 temp_path = Path(temp_file.name)
                 with urlopen(zip_url) as response:
-                    temp_file.write(response.read())
+                    # Stream to disk so the archive is never held in memory
+                    shutil.copyfileobj(response, temp_file, _DOWNLOAD_CHUNK_SIZE)
                     temp_file.flush()
 
             # Move to final location (after temp_file is closed)
@@ -195,11 +267,10 @@ class GlobalCacheManager:
 
         # Extract to temporary directory first
         with tempfile.TemporaryDirectory(dir=dir_path.parent) as temp_extract_dir:
-            with zipfile.ZipFile(archive_path, "r") as zip_ref:
-                zip_ref.extractall(temp_extract_dir)
+            extract_path = Path(temp_extract_dir)
+            self._extract_members(archive_path, extract_path)
 
             # Find the extracted directory (usually has format "repo-branch")
-            extract_path = Path(temp_extract_dir)
             extracted_dirs = [d for d in extract_path.iterdir() if d.is_dir()]
 
             if not extracted_dirs:
@@ -215,6 +286,48 @@ class GlobalCacheManager:
 
         logger.info(f"Archive expanded to {dir_path}")
 
+    def _extract_members(self, archive_path: Path, dest: Path) -> None:
+        """Extract every member of *archive_path* into *dest*.
+
+        zlib releases the GIL while inflating, so the files are split into
+        batches that are decompressed on a few threads, each with its own
+        ``ZipFile`` handle (a handle cannot be shared between threads).
+        ``ZipFile.extract`` creates missing parent directories without
+        tolerating a concurrent ``makedirs``, so the directory entries and
+        the first file of every directory are extracted serially first;
+        by the time the workers run, every directory they need exists.
+        Member paths are sanitised by ``ZipFile.extract`` itself.
+
+        Args:
+            archive_path: Path to the zip archive
+            dest: Directory where to extract the contents
+        """
+        files: List[zipfile.ZipInfo] = []
+        with zipfile.ZipFile(archive_path, "r") as zip_ref:
+            seen_dirs = set()
+            for info in zip_ref.infolist():
+                parent = os.path.dirname(info.filename)
+                if info.is_dir() or parent not in seen_dirs:
+                    seen_dirs.add(parent)
+                    zip_ref.extract(info, dest)
+                else:
+                    files.append(info)
+
+        def _extract_batch(batch: List[zipfile.ZipInfo]) -> None:
+            with zipfile.ZipFile(archive_path, "r") as zip_ref:
+                for info in batch:
+                    zip_ref.extract(info, dest)
+
+        workers = min(_MAX_EXTRACT_WORKERS, os.cpu_count() or 1, len(files))
+        if workers <= 1:
+            _extract_batch(files)
+            return
+
+        batches = [files[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Consume the results so a failing batch raises here
+            list(executor.map(_extract_batch, batches))
+
     def _is_expansion_complete(self, dir_path: Path, done_path: Path) -> bool:
         """Check if archive expansion is complete.
 
@@ -272,7 +385,7 @@ class GlobalCacheManager:
                     return dir_path
 
                 # Acquire lock for the directory to prevent concurrent expansion
-                with FileLock(dir_lock_path, timeout=60):
+                with self._hold_lock(dir_lock_path, timeout=60):
                     # Double-check after acquiring lock
                     if self._is_expansion_complete(dir_path, done_path):
                         logger.debug(
@@ -283,7 +396,7 @@ class GlobalCacheManager:
                     # Check if archive exists, if not download it
                     if not archive_path.exists():
                         # Acquire lock for archive download
-                        with FileLock(archive_lock_path, timeout=60):
+                        with self._hold_lock(archive_lock_path, timeout=60):
                             # Double-check after acquiring archive lock
                             if not archive_path.exists():
                                 logger.info(
@@ -546,15 +659,22 @@ class GlobalCacheManager:
         if not self.cache_root.exists():
             return total_size
 
-        import os
-
-        for root, dirs, files in os.walk(self.cache_root):
-            for file in files:
-                file_path = Path(root) / file
-                try:
-                    total_size += file_path.stat().st_size
-                except (OSError, FileNotFoundError):
-                    # Skip files that can't be accessed
-                    continue
+        # Walk with os.scandir so no Path object is built per file
+        pending = [str(self.cache_root)]
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            else:
+                                total_size += entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            # Skip files that can't be accessed
+                            continue
+            except OSError:
+                # Skip directories removed or locked while walking
+                continue
 
         return total_size
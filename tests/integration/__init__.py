@@ -1,8 +1,20 @@
 """Integration tests package marker."""
 
+import functools
+import io
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
 import time
 import unittest
-from typing import Optional
+import uuid
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from unittest import mock
 
 
 class TimedTestCase(unittest.TestCase):
@@ -31,3 +43,152 @@ class TimedTestCase(unittest.TestCase):
             print(
                 f"[DURATION] {class_name}.{test_name}: {duration:.4f}s", file=sys.stderr
             )
+
+
+# Opt-in mode where run_cli spawns the real console script
+_REAL_SUBPROCESS = os.environ.get("TPO_TEST_SUBPROCESS") == "1"
+
+
+# Format ``configure_logging`` gives the CLI's log lines in a real process
+_LOG_FORMAT = "%(asctime)s [%(levelname)-8s] %(name)s: %(message)s"
+
+
+def _run_main(argv: List[str]) -> int:
+    """Call :func:`pio_compiler.cli.main` and map ``SystemExit`` to a code."""
+    from pio_compiler.cli import main
+
+    try:
+        return main(list(argv))
+    except SystemExit as exc:  # argparse errors exit instead of returning
+        code = exc.code
+        return code if isinstance(code, int) else (0 if code is None else 1)
+
+
+def run_cli(
+    argv: List[str],
+    cwd: Optional[Union[str, Path]] = None,
+    env: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+) -> Tuple[int, str, str]:
+    """Invoke the ``tpo`` entry point in-process and capture its output.
+
+    Spawning ``uv run tpo`` for every build costs an interpreter start-up and
+    an environment resolution, which dominates the runtime of the quicker
+    tests.  Calling :func:`pio_compiler.cli.main` directly avoids both.  The
+    working directory is switched to *cwd*, and the variables in *env* are
+    overlaid on ``os.environ``, for the duration of the call, so this helper
+    must not be used from several threads at once.
+
+    The CLI reports progress (``[BUILD]``, ``[DONE]``, ``[FAILED]``) through
+    :mod:`logging`.  The root handler installed at import time writes to the
+    original stderr - or, under pytest, was never installed at all - so a
+    handler writing to the captured stderr is added, and the root level set
+    the way ``configure_logging`` sets it, while the CLI runs.
+
+    Set ``TPO_TEST_SUBPROCESS=1`` to run the installed ``tpo`` console script
+    in a real subprocess instead, which also validates the packaging metadata.
+    A call with a *timeout* always takes that route: a build that has not
+    finished after *timeout* seconds is killed and
+    :class:`subprocess.TimeoutExpired` raised.  An in-process build cannot be
+    stopped, and one left running would keep writing into whatever working
+    directory and output streams the next test sets up.
+
+    Returns a ``(returncode, stdout, stderr)`` triple.
+    """
+    if _REAL_SUBPROCESS or timeout is not None:
+        # The child writes straight into temporary files, so a chatty build
+        # (LuminescentGrand) is neither pumped through pipes nor held in
+        # memory while it runs.
+        with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+            returncode = subprocess.call(
+                ["tpo", *argv],
+                cwd=cwd,
+                env={**os.environ, **(env or {})},
+                stdout=out,
+                stderr=err,
+                # Descriptors opened by Python are non-inheritable already, so
+                # skip closing every fd pytest has open in the forked child.
+                close_fds=False,
+                timeout=timeout,
+            )
+            out.seek(0)
+            err.seek(0)
+            return (
+                returncode,
+                out.read().decode("utf-8", errors="replace"),
+                err.read().decode("utf-8", errors="replace"),
+            )
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    root = logging.getLogger()
+    handler = logging.StreamHandler(stderr)
+    handler.setFormatter(logging.Formatter(_LOG_FORMAT))
+    previous_level = root.level
+    previous_cwd = os.getcwd()
+    try:
+        if cwd is not None:
+            os.chdir(cwd)
+        with (
+            mock.patch.dict(os.environ, env or {}),
+            redirect_stdout(stdout),
+            redirect_stderr(stderr),
+        ):
+            level = os.environ.get("PIO_COMPILER_LOG_LEVEL", "INFO")
+            root.setLevel(int(level) if level.isdigit() else level.upper())
+            root.addHandler(handler)
+
+            returncode = _run_main(argv)
+    finally:
+        root.removeHandler(handler)
+        root.setLevel(previous_level)
+        os.chdir(previous_cwd)
+    return returncode, stdout.getvalue(), stderr.getvalue()
+
+
+def dir_has_content(root: Union[str, Path]) -> bool:
+    """Return True if *root* has at least one entry, without walking the tree.
+
+    Any file or sub-directory counts, which is all an "is the cache populated"
+    check needs; ``list(root.rglob("*"))`` would stat every artefact instead.
+    """
+    with os.scandir(root) as entries:
+        return next(entries, None) is not None
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+BLINK_REL_PATH = Path("tests/test_data/examples/Blink")
+
+
+@functools.lru_cache(maxsize=None)
+def blink_native_build() -> Tuple[int, str, str]:
+    """Build the *Blink* example for *native* once and return the cached result.
+
+    Several tests only need to know that this canonical build succeeds, so
+    they share a single compilation per test process instead of each paying
+    for their own.
+    """
+    return run_cli([str(BLINK_REL_PATH), "--native"], cwd=PROJECT_ROOT)
+
+
+def async_purge(path: Path) -> None:
+    """Move *path* out of the way and delete it on a background thread.
+
+    The rename is a single syscall, so the caller can immediately start
+    against a fresh, empty directory while the old tree is removed.  The
+    deleting thread is not a daemon, so the interpreter finishes the removal
+    before it exits rather than leaving a half-deleted tree behind.
+    """
+    if not path.exists():
+        return
+    doomed = path.with_name(f"{path.name}.old.{uuid.uuid4().hex}")
+    try:
+        path.rename(doomed)
+    except OSError:
+        # Something still holds the directory open (typically on Windows)
+        shutil.rmtree(path, ignore_errors=True)
+        return
+    threading.Thread(
+        target=shutil.rmtree,
+        args=(doomed,),
+        kwargs={"ignore_errors": True},
+    ).start()
@@ -0,0 +1,142 @@
+"""Persistent cache of CLI build results for the integration tests.
+
+Several integration tests only look at the exit code and the console output
+of a ``tpo`` build, yet every run recompiles the sketch through PlatformIO,
+which dominates the suite's runtime.  :func:`cached_run` replays a previous
+result when nothing that could change it has changed: the key covers the
+sketch tree, the command line, the ``pio_compiler`` sources, the capture
+harness (:func:`run_cli`), the Python and PlatformIO versions and the
+``PLATFORMIO_*`` environment.  The platform and toolchain packages PlatformIO
+installs are only known once a build has run, so instead of hashing them every
+entry expires after :data:`MAX_AGE` seconds and the build is checked again.
+
+Tests that check a property of a build rather than its output use
+:func:`is_verified` and :func:`mark_verified` to skip once the property has
+held for the same inputs.
+
+Set ``PIO_TEST_NOCACHE=1`` to always run the real build.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.metadata
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+import pio_compiler
+
+from . import run_cli
+
+CACHE_ROOT = Path.home() / ".cache" / "pio-compiler" / "tests"
+_PACKAGE_ROOT = Path(pio_compiler.__file__).resolve().parent
+# run_cli decides what ends up in a stored stdout/stderr, so results recorded
+# by an older version of it must not be replayed
+_HARNESS_FILE = Path(__file__).resolve().with_name("__init__.py")
+# Stored results and verified markers older than this are ignored
+MAX_AGE = 7 * 24 * 60 * 60
+
+
+def _platformio_version() -> str:
+    try:
+        return importlib.metadata.version("platformio")
+    except importlib.metadata.PackageNotFoundError:
+        return "not installed"
+
+
+def _is_fresh(path: Path) -> bool:
+    """Return True if *path* exists and was written less than MAX_AGE ago."""
+    try:
+        return time.time() - path.stat().st_mtime < MAX_AGE
+    except OSError:
+        return False
+
+
+def _hash_tree(digest: Any, root: Path) -> None:
+    """Feed every file below *root* (path and contents) into *digest*."""
+    for path in sorted(p for p in root.rglob("*") if p.is_file()):
+        if "__pycache__" in path.parts:
+            continue
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+
+
+def cache_key(argv: Iterable[str], src_dir: Path) -> str:
+    """Return the cache key for building *src_dir* with *argv*."""
+    digest = hashlib.sha256()
+    digest.update(sys.version.encode())
+    digest.update(_platformio_version().encode())
+    platformio_env = {
+        name: value
+        for name, value in os.environ.items()
+        if name.startswith("PLATFORMIO_")
+    }
+    digest.update(json.dumps(platformio_env, sort_keys=True).encode())
+    digest.update(json.dumps(list(argv)).encode())
+    _hash_tree(digest, src_dir)
+    _hash_tree(digest, _PACKAGE_ROOT)
+    digest.update(_HARNESS_FILE.read_bytes())
+    return digest.hexdigest()
+
+
+def cached_run(
+    argv: List[str],
+    src_dir: Path,
+    cwd: Optional[Union[str, Path]] = None,
+    cache_failures: bool = False,
+    timeout: Optional[float] = None,
+) -> Tuple[int, str, str]:
+    """Run the CLI like :func:`run_cli`, replaying a stored result if possible.
+
+    Only successful builds are stored unless *cache_failures* is set, so a
+    transient failure (a network hiccup while PlatformIO installs a package,
+    say) is never replayed into later runs.  Tests that expect the build to
+    fail opt in with *cache_failures*.  *timeout* is passed to
+    :func:`run_cli` when the build actually runs.
+    """
+    if os.environ.get("PIO_TEST_NOCACHE") == "1":
+        return run_cli(argv, cwd=cwd, timeout=timeout)
+
+    entry = CACHE_ROOT / f"{cache_key(argv, Path(src_dir))}.json"
+    if _is_fresh(entry):
+        try:
+            stored = json.loads(entry.read_text(encoding="utf-8"))
+            return stored["returncode"], stored["stdout"], stored["stderr"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    returncode, stdout, stderr = run_cli(argv, cwd=cwd, timeout=timeout)
+    if returncode == 0 or cache_failures:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a concurrent xdist worker never reads half a file
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps({"returncode": returncode, "stdout": stdout, "stderr": stderr}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, entry)
+    return returncode, stdout, stderr
+
+
+def _marker(key: str) -> Path:
+    return CACHE_ROOT / "verified" / f"{key}.ok"
+
+
+def is_verified(key: str) -> bool:
+    """Return True when :func:`mark_verified` was called for *key* recently."""
+    if os.environ.get("PIO_TEST_NOCACHE") == "1":
+        return False
+    return _is_fresh(_marker(key))
+
+
+def mark_verified(key: str) -> None:
+    """Record that the check identified by *key* passed."""
+    marker = _marker(key)
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.touch()
@@ -1,11 +1,16 @@
 import re
-import shutil
 import subprocess
 import sys
+import tempfile
 import time
 import unittest
 from pathlib import Path
 
+from . import dir_has_content
+
+# Cache directory marker printed by ``tpo --fast``
+_CACHE_DIR_RE = re.compile(r"\[FAST\] Using cache directory: (.+)")
+
 
 class CliFastBuildIntegrationTest(unittest.TestCase):
     """Verify that the *--fast* flag re-uses a fingerprinted build directory and speeds up warm builds."""
@@ -14,16 +19,11 @@ class CliFastBuildIntegrationTest(unittest.TestCase):
 
     def setUp(self) -> None:  # noqa: D401 – imperative mood is fine here
         self.project_root = Path(__file__).resolve().parent.parent.parent
-        # Ensure a clean slate by removing the global fast cache directory.
-        self.fast_cache_root = self.project_root / ".tpo"
-        if self.fast_cache_root.exists():
-            shutil.rmtree(self.fast_cache_root, ignore_errors=True)
-
-    def tearDown(self) -> None:  # noqa: D401 – imperative mood is fine here
-        # Remove the cache directory to keep the workspace clean so that other
-        # tests start from a predictable state.
-        if self.fast_cache_root.exists():
-            shutil.rmtree(self.fast_cache_root, ignore_errors=True)
+        # Build from a private workspace so the fast cache (``<cwd>/.tpo``)
+        # starts empty and is not shared with builds on other xdist workers.
+        self._workspace = tempfile.TemporaryDirectory()
+        self.addCleanup(self._workspace.cleanup)
+        self.workspace = Path(self._workspace.name)
 
     # ------------------------------------------------------------------
     # Actual test logic.
@@ -31,19 +31,27 @@ class CliFastBuildIntegrationTest(unittest.TestCase):
     def test_fast_build_is_cached(self) -> None:
         """Run the CLI twice with *--fast* and assert the 2nd run hits the cache."""
 
-        cmd = f"uv run tpo --fast --native {self.EXAMPLE_REL_PATH}"
+        # Run the CLI module with this interpreter rather than through a shell
+        # and ``uv run``, which would resolve the environment on every build
+        cmd = [
+            sys.executable,
+            "-m",
+            "pio_compiler.cli",
+            "--fast",
+            "--native",
+            str(self.project_root / self.EXAMPLE_REL_PATH),
+        ]
 
         # ------------------------- cold build -------------------------
-        t0 = time.time()
+        t0 = time.perf_counter()
         result1 = subprocess.run(
             cmd,
-            cwd=self.project_root,
-            shell=True,
+            cwd=self.workspace,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
         )
-        cold_duration = time.time() - t0
+        cold_duration = time.perf_counter() - t0
 
         if result1.returncode != 0:  # pragma: no cover – diagnostic helper
             print("COLD BUILD STDOUT:\n", result1.stdout)
@@ -51,30 +59,27 @@ class CliFastBuildIntegrationTest(unittest.TestCase):
         self.assertEqual(result1.returncode, 0, "First build failed")
 
         # Extract cache directory path from output – the CLI prints a marker
-        cache_match = re.search(r"\[FAST\] Using cache directory: (.+)", result1.stdout)
+        cache_match = _CACHE_DIR_RE.search(result1.stdout)
         self.assertIsNotNone(cache_match, "CLI did not report the cache directory")
         assert cache_match is not None  # type checker hint
         cache_dir = Path(cache_match.group(1).strip())
         self.assertTrue(
             cache_dir.exists(), "Cache directory does not exist after first build"
         )
-        self.assertGreater(
-            len(list(cache_dir.rglob("*"))),
-            0,
-            "Cache directory is empty after first build",
+        self.assertTrue(
+            dir_has_content(cache_dir), "Cache directory is empty after first build"
         )
 
         # ------------------------- warm build -------------------------
-        t1 = time.time()
+        t1 = time.perf_counter()
         result2 = subprocess.run(
             cmd,
-            cwd=self.project_root,
-            shell=True,
+            cwd=self.workspace,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
         )
-        warm_duration = time.time() - t1
+        warm_duration = time.perf_counter() - t1
 
         if result2.returncode != 0:  # pragma: no cover – diagnostic helper
             print("WARM BUILD STDOUT:\n", result2.stdout)
@@ -14,49 +14,29 @@ returns an *exit code* of **0**.
 
 from __future__ import annotations
 
-import subprocess
 import sys
 import unittest
-from pathlib import Path
-from shutil import which
+
+from . import blink_native_build
 
 
 class CliAlternativeSyntaxTest(unittest.TestCase):
     """Ensure that the alternative *example-first* syntax works."""
 
-    EXAMPLE_REL_PATH = Path("tests/test_data/examples/Blink")
-
-    def setUp(self) -> None:  # pragma: no cover – purely for early exit
-        # The compiler automatically falls back to *simulation* mode when
-        # PlatformIO is unavailable, therefore we do not skip the test if the
-        # executable is missing.  The explicit *which* invocation remains for
-        # documentation purposes and to make the intent clear.
-        _ = which("platformio")  # noqa: S608 – benign check
+    # The compiler automatically falls back to *simulation* mode when
+    # PlatformIO is unavailable, therefore we do not skip the test if the
+    # executable is missing.
 
     def test_example_first_invocation(self) -> None:
-        """Run the CLI via the *console-script* entry point using the alternative syntax and a *full* shell command string."""
-
-        # Change to the repository root so that the relative example path
-        # resolves correctly during the test run.
-        project_root = Path(__file__).resolve().parent.parent.parent
-
-        # Call the *console-script* entry point that is installed via
-        # ``[project.scripts]`` in *pyproject.toml*.  Using the actual shell
-        # command mirrors real-world usage much closer than ``python -m`` and
-        # ensures that the packaging metadata remains correct.
-        cmd = f"tpo {self.EXAMPLE_REL_PATH} --native"
-
-        result = subprocess.run(
-            cmd,
-            cwd=project_root,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
-
-        if result.returncode != 0:  # pragma: no cover – dump output to aid debugging
-            print("STDOUT:\n", result.stdout)
-            print("STDERR:\n", result.stderr, file=sys.stderr)
-
-        self.assertEqual(result.returncode, 0, "CLI returned non-zero exit code")
+        """Run the CLI via the *console-script* entry point using the alternative syntax."""
+
+        # The shared build runs ``main`` - the function ``[project.scripts]``
+        # in *pyproject.toml* binds to ``tpo`` - in-process with exactly the
+        # argument order a user would type.
+        returncode, stdout, stderr = blink_native_build()
+
+        if returncode != 0:  # pragma: no cover – dump output to aid debugging
+            print("STDOUT:\n", stdout)
+            print("STDERR:\n", stderr, file=sys.stderr)
+
+        self.assertEqual(returncode, 0, "CLI returned non-zero exit code")
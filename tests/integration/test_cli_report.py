@@ -7,23 +7,32 @@ PlatformIO configuration.
 
 from __future__ import annotations
 
-import subprocess
+import shutil
 import tempfile
 import unittest
 from pathlib import Path
-from shutil import which
+
+from . import run_cli
+from ._build_cache import cached_run
 
 
 class CliReportTest(unittest.TestCase):
     """Test the --report flag functionality."""
 
+    # The compiler automatically falls back to *simulation* mode when
+    # PlatformIO is unavailable, so no check for the executable is needed.
+
     EXAMPLE_REL_PATH = Path("tests/test_data/examples/Blink")
 
-    def setUp(self) -> None:  # pragma: no cover – purely for early exit
-        # The compiler automatically falls back to *simulation* mode when
-        # PlatformIO is unavailable, therefore we do not skip the test if the
-        # executable is missing.
-        _ = which("platformio")
+    @classmethod
+    def setUpClass(cls) -> None:
+        # One report directory for the class; the report files are rewritten
+        # by every --report run, so nothing leaks from one test to another.
+        cls._tmp = tempfile.mkdtemp(prefix="tpo_report_")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(cls._tmp, ignore_errors=True)
 
     def test_report_flag_creates_platformio_ini_tpo(self) -> None:
         """Test that --report flag creates platformio.ini.tpo file."""
@@ -32,57 +41,51 @@ class CliReportTest(unittest.TestCase):
         # resolves correctly during the test run.
         project_root = Path(__file__).resolve().parent.parent.parent
 
-        # Create a temporary directory for the report output
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_report_dir = Path(temp_dir)
-
-            # Run the CLI with --report flag
-            cmd = f"tpo {self.EXAMPLE_REL_PATH} --native --report {temp_report_dir}"
-
-            result = subprocess.run(
-                cmd,
-                cwd=project_root,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-
-            # The command should succeed
-            if (
-                result.returncode != 0
-            ):  # pragma: no cover – dump output to aid debugging
-                print("STDOUT:\n", result.stdout)
-                print("STDERR:\n", result.stderr)
-
-            self.assertEqual(result.returncode, 0, "CLI returned non-zero exit code")
-
-            # Check that platformio.ini.tpo was created
-            platformio_ini_tpo = temp_report_dir / "platformio.ini.tpo"
-            self.assertTrue(
-                platformio_ini_tpo.exists(),
-                f"platformio.ini.tpo should be created at {platformio_ini_tpo}",
-            )
-
-            # Verify the file has content (should contain PlatformIO configuration)
-            content = platformio_ini_tpo.read_text()
-            self.assertGreater(
-                len(content), 0, "platformio.ini.tpo should not be empty"
-            )
-
-            # Should contain native environment configuration
-            self.assertIn(
-                "native",
-                content,
-                "platformio.ini.tpo should contain native environment",
-            )
-
-            # Verify that the output mentions the platformio.ini.tpo file
-            self.assertIn(
-                "platformio.ini.tpo",
-                result.stdout,
-                "CLI output should mention the platformio.ini.tpo file",
-            )
+        # Report output goes to the directory shared by the class
+        temp_report_dir = Path(self._tmp)
+
+        # Run the CLI with --report flag
+        returncode, stdout, stderr = run_cli(
+            [
+                str(self.EXAMPLE_REL_PATH),
+                "--native",
+                "--report",
+                str(temp_report_dir),
+            ],
+            cwd=project_root,
+        )
+
+        # The command should succeed
+        if returncode != 0:  # pragma: no cover – dump output to aid debugging
+            print("STDOUT:\n", stdout)
+            print("STDERR:\n", stderr)
+
+        self.assertEqual(returncode, 0, "CLI returned non-zero exit code")
+
+        # Check that platformio.ini.tpo was created
+        platformio_ini_tpo = temp_report_dir / "platformio.ini.tpo"
+        self.assertTrue(
+            platformio_ini_tpo.exists(),
+            f"platformio.ini.tpo should be created at {platformio_ini_tpo}",
+        )
+
+        # Verify the file has content (should contain PlatformIO configuration)
+        content = platformio_ini_tpo.read_text()
+        self.assertGreater(len(content), 0, "platformio.ini.tpo should not be empty")
+
+        # Should contain native environment configuration
+        self.assertIn(
+            "native",
+            content,
+            "platformio.ini.tpo should contain native environment",
+        )
+
+        # Verify that the output mentions the platformio.ini.tpo file
+        self.assertIn(
+            "platformio.ini.tpo",
+            stdout,
+            "CLI output should mention the platformio.ini.tpo file",
+        )
 
     def test_report_flag_without_directory_still_works(self) -> None:
         """Test that --info flag works without --report directory."""
@@ -92,30 +95,26 @@ class CliReportTest(unittest.TestCase):
         project_root = Path(__file__).resolve().parent.parent.parent
 
         # Run the CLI with --info flag (should work without creating platformio.ini.tpo)
-        cmd = f"tpo {self.EXAMPLE_REL_PATH} --native --info"
+        argv = [str(self.EXAMPLE_REL_PATH), "--native", "--info"]
 
-        result = subprocess.run(
-            cmd,
-            cwd=project_root,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
+        # Only the console output is checked, so a stored result can be replayed
+        returncode, stdout, stderr = cached_run(
+            argv, project_root / self.EXAMPLE_REL_PATH, cwd=project_root
         )
 
         # The command should succeed
-        if result.returncode != 0:  # pragma: no cover – dump output to aid debugging
-            print("STDOUT:\n", result.stdout)
-            print("STDERR:\n", result.stderr)
+        if returncode != 0:  # pragma: no cover – dump output to aid debugging
+            print("STDOUT:\n", stdout)
+            print("STDERR:\n", stderr)
 
-        self.assertEqual(result.returncode, 0, "CLI returned non-zero exit code")
+        self.assertEqual(returncode, 0, "CLI returned non-zero exit code")
 
         # Should show build info output
-        self.assertIn("build info", result.stdout, "CLI output should show build info")
+        self.assertIn("build info", stdout, "CLI output should show build info")
 
         # Should NOT mention platformio.ini.tpo since no --report directory was specified
         self.assertNotIn(
             "platformio.ini.tpo",
-            result.stdout,
+            stdout,
             "CLI output should not mention platformio.ini.tpo without --report",
         )
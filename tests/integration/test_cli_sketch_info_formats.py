@@ -1,10 +1,13 @@
 """Integration tests for SKETCH-INFO format support in CLI."""
 
-import tempfile
 import unittest
 from pathlib import Path
 
-from pio_compiler.cli import _build_argument_parser, _parse_sketch_dependencies
+from pio_compiler.cli import (
+    _build_argument_parser,
+    _parse_sketch_dependencies,
+    _parse_sketch_dependencies_text,
+)
 
 
 class TestSketchInfoFormatsIntegration(unittest.TestCase):
@@ -12,10 +15,8 @@ class TestSketchInfoFormatsIntegration(unittest.TestCase):
 
     def test_cli_handles_double_slash_sketch_info(self) -> None:
         """Test that CLI correctly parses dependencies from // SKETCH-INFO format."""
-        # Create a temporary sketch with double-slash format
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".ino", delete=False) as f:
-            f.write(
-                """// SKETCH-INFO
+        # Sketch source with double-slash format, parsed in memory
+        source = """// SKETCH-INFO
 // dependencies = ["FastLED", "WiFiManager"]
 // SKETCH-INFO
 
@@ -25,30 +26,23 @@ class TestSketchInfoFormatsIntegration(unittest.TestCase):
 void setup() {}
 void loop() {}
 """
-            )
-            temp_path = Path(f.name)
 
-        try:
-            parser = _build_argument_parser()
-            ns = parser.parse_args([str(temp_path), "--native"])
-            # Validate parsing succeeded
-            self.assertIsNotNone(ns)
+        parser = _build_argument_parser()
+        ns = parser.parse_args(["DoubleSlash.ino", "--native"])
+        # Validate parsing succeeded
+        self.assertIsNotNone(ns)
 
-            # Parse dependencies
-            dependencies = _parse_sketch_dependencies(temp_path)
+        # Parse dependencies
+        dependencies = _parse_sketch_dependencies_text(source)
 
-            self.assertEqual(len(dependencies), 2)
-            self.assertIn("FastLED", dependencies)
-            self.assertIn("WiFiManager", dependencies)
-        finally:
-            temp_path.unlink()
+        self.assertEqual(len(dependencies), 2)
+        self.assertIn("FastLED", dependencies)
+        self.assertIn("WiFiManager", dependencies)
 
     def test_cli_handles_mixed_format_sketch_files(self) -> None:
         """Test that CLI can process multiple sketches with different SKETCH-INFO formats."""
-        # Create a temporary sketch with mixed format
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".ino", delete=False) as f:
-            f.write(
-                """// SKETCH-INFO
+        # Sketch source with mixed format, parsed in memory
+        source = """// SKETCH-INFO
 // dependencies = ["ArduinoOTA", "ESPAsyncWebServer"]  
 /// SKETCH-INFO
 
@@ -58,24 +52,19 @@ void loop() {}
 void setup() {}
 void loop() {}
 """
-            )
-            temp_path = Path(f.name)
-
-        try:
-            # Parse with CLI argument parser
-            parser = _build_argument_parser()
-            ns = parser.parse_args([str(temp_path), "--esp32dev"])
-            # Validate parsing succeeded
-            self.assertIsNotNone(ns)
-
-            # Parse dependencies
-            dependencies = _parse_sketch_dependencies(temp_path)
-
-            self.assertEqual(len(dependencies), 2)
-            self.assertIn("ArduinoOTA", dependencies)
-            self.assertIn("ESPAsyncWebServer", dependencies)
-        finally:
-            temp_path.unlink()
+
+        # Parse with CLI argument parser
+        parser = _build_argument_parser()
+        ns = parser.parse_args(["MixedFormat.ino", "--esp32dev"])
+        # Validate parsing succeeded
+        self.assertIsNotNone(ns)
+
+        # Parse dependencies
+        dependencies = _parse_sketch_dependencies_text(source)
+
+        self.assertEqual(len(dependencies), 2)
+        self.assertIn("ArduinoOTA", dependencies)
+        self.assertIn("ESPAsyncWebServer", dependencies)
 
     def test_backwards_compatibility_with_triple_slash(self) -> None:
         """Ensure that existing /// format still works correctly."""
@@ -11,11 +11,11 @@ succeeded.
 
 from __future__ import annotations
 
-import subprocess
 import sys
 import unittest
 from pathlib import Path
-from shutil import which
+
+from ._build_cache import cached_run
 
 
 class CliTeensy30AlternativeSyntaxTest(unittest.TestCase):
@@ -23,32 +23,25 @@ class CliTeensy30AlternativeSyntaxTest(unittest.TestCase):
 
     EXAMPLE_REL_PATH = Path("tests/test_data/examples/Blink")
 
-    def setUp(self) -> None:  # pragma: no cover – purely for early exit
-        # Confirm that *platformio* is available – when it's missing the compiler
-        # will fall back to simulation mode so we do not skip the test.
-        _ = which("platformio")  # noqa: S608 – benign check
+    # When *platformio* is missing the compiler falls back to simulation mode,
+    # so we do not skip the test.
 
     def test_teensy30_example_first_invocation(self) -> None:
         """Run the CLI via the *console-script* entry point using the alternative syntax."""
 
         project_root = Path(__file__).resolve().parent.parent.parent
 
-        cmd = f"tpo {self.EXAMPLE_REL_PATH} --teensy30"
+        argv = [str(self.EXAMPLE_REL_PATH), "--teensy30"]
 
-        result = subprocess.run(
-            cmd,
-            cwd=project_root,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
+        returncode, stdout, stderr = cached_run(
+            argv, project_root / self.EXAMPLE_REL_PATH, cwd=project_root
         )
 
-        if result.returncode != 0:  # pragma: no cover – dump output to aid debugging
-            print("STDOUT:\n", result.stdout)
-            print("STDERR:\n", result.stderr, file=sys.stderr)
+        if returncode != 0:  # pragma: no cover – dump output to aid debugging
+            print("STDOUT:\n", stdout)
+            print("STDERR:\n", stderr, file=sys.stderr)
 
-        self.assertEqual(result.returncode, 0, "CLI returned non-zero exit code")
+        self.assertEqual(returncode, 0, "CLI returned non-zero exit code")
 
 
 if __name__ == "__main__":
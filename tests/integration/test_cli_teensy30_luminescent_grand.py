@@ -13,11 +13,11 @@ error analysis.
 from __future__ import annotations
 
 import platform
-import subprocess
 import sys
 import unittest
 from pathlib import Path
-from shutil import which
+
+from . import run_cli
 
 ENABLED = False
 
@@ -27,10 +27,8 @@ class CliTeensy30LuminescentGrandTest(unittest.TestCase):
 
     EXAMPLE_REL_PATH = Path("tests/test_data/examples/LuminescentGrand")
 
-    def setUp(self) -> None:  # pragma: no cover – purely for early exit
-        # Confirm that *platformio* is available – when it's missing the compiler
-        # will fall back to simulation mode so we do not skip the test.
-        _ = which("platformio")  # noqa: S608 – benign check
+    # When *platformio* is missing the compiler falls back to simulation mode,
+    # so we do not skip the test.
 
     @unittest.skipIf(not ENABLED, "Skipping test due to ENABLED flag")
     def test_teensy30_luminescent_grand_compilation(self) -> None:
@@ -41,15 +39,12 @@ class CliTeensy30LuminescentGrandTest(unittest.TestCase):
 
         project_root = Path(__file__).resolve().parent.parent.parent
 
-        cmd = f"tpo {self.EXAMPLE_REL_PATH} --teensy30"
+        argv = [str(self.EXAMPLE_REL_PATH), "--teensy30"]
+        cmd = f"tpo {' '.join(argv)}"
 
-        result = subprocess.run(
-            cmd,
+        returncode, stdout, stderr = run_cli(
+            argv,
             cwd=project_root,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
             timeout=300,  # 5 minute timeout for complex project
         )
 
@@ -59,16 +54,16 @@ class CliTeensy30LuminescentGrandTest(unittest.TestCase):
         if is_windows:
             # On Windows, we expect this to fail due to missing bits/c++config.h in toolchain
             self.assertNotEqual(
-                result.returncode,
+                returncode,
                 0,
                 f"Expected compilation to fail on Windows due to toolchain issues, but it succeeded.\n"
                 f"Command: {cmd}\n"
-                f"STDOUT: {result.stdout}\n"
-                f"STDERR: {result.stderr}",
+                f"STDOUT: {stdout}\n"
+                f"STDERR: {stderr}",
             )
 
             # Verify that the expected error appears
-            combined_output = result.stdout + result.stderr
+            combined_output = stdout + stderr
             self.assertIn(
                 "bits/c++config.h",
                 combined_output,
@@ -76,23 +71,21 @@ class CliTeensy30LuminescentGrandTest(unittest.TestCase):
             )
         else:
             # On non-Windows platforms, expect success
-            if (
-                result.returncode != 0
-            ):  # pragma: no cover – dump output to aid debugging
-                print("STDOUT:\n", result.stdout)
-                print("STDERR:\n", result.stderr, file=sys.stderr)
+            if returncode != 0:  # pragma: no cover – dump output to aid debugging
+                print("STDOUT:\n", stdout)
+                print("STDERR:\n", stderr, file=sys.stderr)
 
             self.assertEqual(
-                result.returncode,
+                returncode,
                 0,
-                f"CLI returned non-zero exit code {result.returncode}.\n"
+                f"CLI returned non-zero exit code {returncode}.\n"
                 f"Command: {cmd}\n"
-                f"STDOUT: {result.stdout}\n"
-                f"STDERR: {result.stderr}",
+                f"STDOUT: {stdout}\n"
+                f"STDERR: {stderr}",
             )
 
         # Verify that the build actually started regardless of success/failure
-        combined_output = result.stdout + result.stderr
+        combined_output = stdout + stderr
         self.assertIn(
             "[BUILD]", combined_output, "Expected build start message in output"
         )
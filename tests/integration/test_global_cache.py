@@ -1,35 +1,39 @@
 """Unit tests for global cache manager with two-stage caching."""
 
+import io
+import shutil
 import tempfile
 import threading
+import time
 import unittest
 import zipfile
 from pathlib import Path
 from unittest.mock import Mock, patch
 
-from filelock import FileLock
+from filelock import FileLock, Timeout
 
-from pio_compiler.global_cache import GlobalCacheManager
+from pio_compiler.global_cache import GlobalCacheManager, _inproc_lock
 
 from . import TimedTestCase
 
 
-class GlobalCacheManagerTest(TimedTestCase):
-    """Test the global cache manager functionality."""
+class ReadOnlyGlobalCacheManagerTest(TimedTestCase):
+    """Test the pure URL and path helpers of the global cache manager.
 
-    def setUp(self) -> None:
-        """Set up test environment with temporary cache directory."""
-        self.temp_dir = Path(tempfile.mkdtemp())
-        self.cache_manager = GlobalCacheManager(
-            cache_root=self.temp_dir / "global_cache"
-        )
+    None of these tests touch the cache directory, so the class shares one
+    manager instead of creating a fresh temporary cache for every test.
+    """
 
-    def tearDown(self) -> None:
-        """Clean up test environment."""
-        import shutil
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Create the shared temporary cache directory and manager."""
+        cls.temp_dir = Path(tempfile.mkdtemp())
+        cls.cache_manager = GlobalCacheManager(cache_root=cls.temp_dir / "global_cache")
 
-        if self.temp_dir.exists():
-            shutil.rmtree(self.temp_dir)
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Remove the shared temporary cache directory."""
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
 
     def test_parse_github_url_valid(self):
         """Test parsing valid GitHub URLs."""
@@ -94,20 +98,61 @@ class GlobalCacheManagerTest(TimedTestCase):
         self.assertEqual(len(hash1), 8)
         self.assertEqual(len(hash2), 8)
 
+
+class GlobalCacheManagerTest(TimedTestCase):
+    """Test the global cache manager functionality."""
+
+    def setUp(self) -> None:
+        """Set up test environment with temporary cache directory."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.cache_manager = GlobalCacheManager(
+            cache_root=self.temp_dir / "global_cache"
+        )
+
+    def tearDown(self) -> None:
+        """Clean up test environment."""
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
     def _create_test_zip(
         self, zip_path: Path, content_dir_name: str = "test-repo-main"
     ):
         """Create a test zip file with a directory structure."""
         zip_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with zipfile.ZipFile(zip_path, "w") as zip_file:
-            # Create a directory structure inside the zip
-            zip_file.writestr(f"{content_dir_name}/", "")
-            zip_file.writestr(f"{content_dir_name}/README.md", "# Test Repository")
+        # The contents are tiny, so store them rather than deflate them
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zip_file:
+            # Create a directory structure inside the zip.  GitHub archives
+            # carry explicit directory entries too, so keep the top-level one.
+            zip_file.writestr(f"{content_dir_name}/", b"")
+            zip_file.writestr(f"{content_dir_name}/README.md", b"# Test Repository")
             zip_file.writestr(
-                f"{content_dir_name}/src/main.cpp", "int main() { return 0; }"
+                f"{content_dir_name}/src/main.cpp", b"int main() { return 0; }"
             )
-            zip_file.writestr(f"{content_dir_name}/library.properties", "name=TestLib")
+            zip_file.writestr(f"{content_dir_name}/library.properties", b"name=TestLib")
+
+    def _mock_response(self, mock_urlopen: Mock, zip_path: Path) -> None:
+        """Serve the bytes of *zip_path* from every ``urlopen`` call."""
+        data = zip_path.read_bytes()
+        mock_urlopen.return_value.__enter__.side_effect = lambda: io.BytesIO(data)
+
+    def _patch_download(self, zip_path: Path) -> Mock:
+        """Make every archive download copy *zip_path* into place instead.
+
+        ``_download_archive`` itself is covered by its own test; the tests
+        that only need an archive in the cache skip the HTTP mock and the
+        round trip of the archive bytes through Python.
+        """
+        patcher = patch.object(
+            self.cache_manager,
+            "_download_archive",
+            side_effect=lambda zip_url, archive_path: shutil.copyfile(
+                zip_path, archive_path
+            ),
+        )
+        mock_download = patcher.start()
+        self.addCleanup(patcher.stop)
+        return mock_download
 
     @patch("pio_compiler.global_cache.urlopen")
     def test_download_archive_success(self, mock_urlopen):
@@ -117,9 +162,7 @@ class GlobalCacheManagerTest(TimedTestCase):
         self._create_test_zip(test_zip_path)
 
         # Mock the HTTP response
-        mock_response = Mock()
-        mock_response.read.return_value = test_zip_path.read_bytes()
-        mock_urlopen.return_value.__enter__.return_value = mock_response
+        self._mock_response(mock_urlopen, test_zip_path)
 
         # Test download
         archive_path = self.temp_dir / "downloaded.zip"
@@ -127,9 +170,8 @@ class GlobalCacheManagerTest(TimedTestCase):
             "https://example.com/test.zip", archive_path
         )
 
-        # Verify archive was downloaded
-        self.assertTrue(archive_path.exists())
-        self.assertGreater(archive_path.stat().st_size, 0)
+        # Verify archive was downloaded intact
+        self.assertEqual(archive_path.read_bytes(), test_zip_path.read_bytes())
 
     def test_expand_archive_success(self):
         """Test successful archive expansion."""
@@ -147,6 +189,53 @@ class GlobalCacheManagerTest(TimedTestCase):
         self.assertTrue((dir_path / "src" / "main.cpp").exists())
         self.assertTrue((dir_path / "library.properties").exists())
 
+    def test_expand_archive_many_members(self):
+        """Test that every member survives the batched parallel expansion."""
+        test_zip_path = self.temp_dir / "many.zip"
+        with zipfile.ZipFile(test_zip_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for i in range(64):
+                zip_file.writestr(f"repo-main/src/dir{i % 4}/file{i}.cpp", f"// {i}")
+
+        dir_path = self.temp_dir / "expanded"
+        self.cache_manager._expand_archive(test_zip_path, dir_path)
+
+        for i in range(64):
+            member = dir_path / "src" / f"dir{i % 4}" / f"file{i}.cpp"
+            self.assertEqual(member.read_text(), f"// {i}")
+
+    def test_extract_members_sanitises_like_extractall(self):
+        """Test that hostile member paths land where extractall puts them."""
+        test_zip_path = self.temp_dir / "evil.zip"
+        names = [
+            "repo-main/README.md",
+            "../escaped.txt",
+            "/abs/rooted.txt",
+            "repo-main/./sub/../dotted.txt",
+        ]
+        with zipfile.ZipFile(test_zip_path, "w") as zip_file:
+            for name in names:
+                zip_file.writestr(name, name)
+
+        parallel_dir = self.temp_dir / "parallel" / "out"
+        parallel_dir.mkdir(parents=True)
+        self.cache_manager._extract_members(test_zip_path, parallel_dir)
+
+        reference_dir = self.temp_dir / "reference" / "out"
+        with zipfile.ZipFile(test_zip_path) as zip_file:
+            zip_file.extractall(reference_dir)
+
+        def _tree(root):
+            return {
+                str(path.relative_to(root)): path.read_text()
+                for path in root.rglob("*")
+                if path.is_file()
+            }
+
+        self.assertEqual(_tree(parallel_dir), _tree(reference_dir))
+        self.assertEqual(len(_tree(parallel_dir)), len(names))
+        # Nothing was written next to the extraction directory
+        self.assertEqual(list((self.temp_dir / "parallel").iterdir()), [parallel_dir])
+
     def test_expansion_completion_markers(self):
         """Test expansion completion markers."""
         dir_path = self.temp_dir / "test_dir"
@@ -168,17 +257,14 @@ class GlobalCacheManagerTest(TimedTestCase):
         content = done_path.read_text()
         self.assertIn("completed at", content)
 
-    @patch("pio_compiler.global_cache.urlopen")
-    def test_get_or_download_framework_success(self, mock_urlopen):
+    def test_get_or_download_framework_success(self):
         """Test successful framework download and caching."""
         # Create a test zip file
         test_zip_path = self.temp_dir / "test.zip"
         self._create_test_zip(test_zip_path, "fastled-main")
 
-        # Mock the HTTP response
-        mock_response = Mock()
-        mock_response.read.return_value = test_zip_path.read_bytes()
-        mock_urlopen.return_value.__enter__.return_value = mock_response
+        # Copy the archive into place instead of downloading it
+        self._patch_download(test_zip_path)
 
         # Test download
         github_url = "https://github.com/fastled/fastled"
@@ -197,17 +283,14 @@ class GlobalCacheManagerTest(TimedTestCase):
         done_path = result_path.parent / f"{result_path.name}.done"
         self.assertTrue(done_path.exists())
 
-    @patch("pio_compiler.global_cache.urlopen")
-    def test_get_or_download_framework_cached(self, mock_urlopen):
+    def test_get_or_download_framework_cached(self):
         """Test that cached frameworks are returned without re-downloading."""
         # Create a test zip file
         test_zip_path = self.temp_dir / "test.zip"
         self._create_test_zip(test_zip_path, "fastled-main")
 
-        # Mock the HTTP response
-        mock_response = Mock()
-        mock_response.read.return_value = test_zip_path.read_bytes()
-        mock_urlopen.return_value.__enter__.return_value = mock_response
+        # Copy the archive into place instead of downloading it
+        mock_download = self._patch_download(test_zip_path)
 
         github_url = "https://github.com/fastled/fastled"
 
@@ -218,7 +301,7 @@ class GlobalCacheManagerTest(TimedTestCase):
         self.assertTrue(result_path1.exists())
 
         # Reset mock to ensure no additional calls
-        mock_urlopen.reset_mock()
+        mock_download.reset_mock()
 
         # Second call should use cache
         result_path2 = self.cache_manager.get_or_download_framework(
@@ -227,7 +310,7 @@ class GlobalCacheManagerTest(TimedTestCase):
         self.assertEqual(result_path1, result_path2)
 
         # Verify no additional HTTP calls were made
-        mock_urlopen.assert_not_called()
+        mock_download.assert_not_called()
 
     def test_get_or_download_framework_multiple_branches(self):
         """Test framework download with multiple branch attempts."""
@@ -242,17 +325,14 @@ class GlobalCacheManagerTest(TimedTestCase):
         self.assertIn("Failed to download framework", str(context.exception))
         self.assertIn("tried branches", str(context.exception))
 
-    @patch("pio_compiler.global_cache.urlopen")
-    def test_concurrent_access_locking(self, mock_urlopen):
+    def test_concurrent_access_locking(self):
         """Test that concurrent access is properly locked."""
         # Create a test zip file
         test_zip_path = self.temp_dir / "test.zip"
         self._create_test_zip(test_zip_path, "fastled-main")
 
-        # Mock the HTTP response
-        mock_response = Mock()
-        mock_response.read.return_value = test_zip_path.read_bytes()
-        mock_urlopen.return_value.__enter__.return_value = mock_response
+        # Copy the archive into place instead of downloading it
+        mock_download = self._patch_download(test_zip_path)
 
         github_url = "https://github.com/fastled/fastled"
         results = []
@@ -282,18 +362,57 @@ class GlobalCacheManagerTest(TimedTestCase):
         self.assertEqual(len(errors), 0)
         self.assertEqual(len(results), 3)
         self.assertTrue(all(r == results[0] for r in results))
-
-    @patch("pio_compiler.global_cache.urlopen")
-    def test_list_cached_frameworks(self, mock_urlopen):
+        # Only the thread that won the lock downloaded the archive
+        self.assertEqual(mock_download.call_count, 1)
+
+    def test_hold_lock_timeout_covers_both_locks(self):
+        """Test that one timeout bounds the wait for both locks together."""
+        lock_path = self.temp_dir / "shared.lock"
+        inproc_lock = _inproc_lock(lock_path)
+
+        # Another thread of this process holds the mutex for a while ...
+        inproc_lock.acquire()
+        releaser = threading.Timer(0.6, inproc_lock.release)
+        releaser.start()
+        self.addCleanup(releaser.join)
+
+        # ... and another process holds the lock file the whole time
+        other_process = FileLock(lock_path)
+        other_process.acquire()
+        self.addCleanup(other_process.release)
+
+        start = time.monotonic()
+        with self.assertRaises(Timeout):
+            with self.cache_manager._hold_lock(lock_path, timeout=1.0):
+                pass
+        elapsed = time.monotonic() - start
+
+        # The file lock only got what was left after the mutex wait
+        self.assertLess(elapsed, 1.4)
+
+    def test_hold_lock_is_shared_between_managers(self):
+        """Test that managers in one process queue on the same mutex."""
+        lock_path = self.temp_dir / "shared.lock"
+        other_manager = GlobalCacheManager(self.temp_dir / "other_cache")
+
+        with self.cache_manager._hold_lock(lock_path, timeout=5):
+            self.assertTrue(_inproc_lock(lock_path).locked())
+            # The second manager waits on the mutex, not on the lock file
+            with self.assertRaises(Timeout):
+                with other_manager._hold_lock(lock_path, timeout=0.2):
+                    pass
+
+        with other_manager._hold_lock(lock_path, timeout=5):
+            pass
+
+    def test_list_cached_frameworks(self):
         """Test listing cached frameworks."""
         # Create test zip files
         test_zip_path = self.temp_dir / "test.zip"
         self._create_test_zip(test_zip_path, "fastled-main")
 
-        # Mock the HTTP response
-        mock_response = Mock()
-        mock_response.read.return_value = test_zip_path.read_bytes()
-        mock_urlopen.return_value.__enter__.return_value = mock_response
+        # Copy the archive into place instead of downloading it
+        self._patch_download(test_zip_path)
 
         # Initially empty
         cached = self.cache_manager.list_cached_frameworks()
@@ -309,17 +428,14 @@ class GlobalCacheManagerTest(TimedTestCase):
         self.assertIn(github_url, cached)
         self.assertEqual(len(cached[github_url]), 1)
 
-    @patch("pio_compiler.global_cache.urlopen")
-    def test_cleanup_cache(self, mock_urlopen):
+    def test_cleanup_cache(self):
         """Test cache cleanup functionality."""
         # Create test zip files
         test_zip_path = self.temp_dir / "test.zip"
         self._create_test_zip(test_zip_path, "fastled-main")
 
-        # Mock the HTTP response
-        mock_response = Mock()
-        mock_response.read.return_value = test_zip_path.read_bytes()
-        mock_urlopen.return_value.__enter__.return_value = mock_response
+        # Copy the archive into place instead of downloading it
+        self._patch_download(test_zip_path)
 
         github_url = "https://github.com/fastled/fastled"
 
@@ -379,17 +495,14 @@ class GlobalCacheManagerTest(TimedTestCase):
         finally:
             lock.release()
 
-    @patch("pio_compiler.global_cache.urlopen")
-    def test_purge_cache(self, mock_urlopen):
+    def test_purge_cache(self):
         """Test cache purging functionality."""
         # Create test zip files
         test_zip_path = self.temp_dir / "test.zip"
         self._create_test_zip(test_zip_path, "fastled-main")
 
-        # Mock the HTTP response
-        mock_response = Mock()
-        mock_response.read.return_value = test_zip_path.read_bytes()
-        mock_urlopen.return_value.__enter__.return_value = mock_response
+        # Copy the archive into place instead of downloading it
+        self._patch_download(test_zip_path)
 
         # Download a framework
         github_url = "https://github.com/fastled/fastled"
@@ -1,9 +1,10 @@
 """Integration test for LuminescentGrand native compilation scenario."""
 
-import subprocess
 import unittest
 from pathlib import Path
 
+from . import run_cli
+
 
 class LuminescentGrandNativeTest(unittest.TestCase):
     """Test compilation of LuminescentGrand project for native platform using tpo command."""
@@ -14,28 +15,23 @@ class LuminescentGrandNativeTest(unittest.TestCase):
         project_root = Path(__file__).resolve().parent.parent.parent
         luminescent_grand_path = "tests/test_data/examples/LuminescentGrand/"
 
-        # Use the tpo command (turbo pio compile) as specified in pyproject.toml
-        cmd = f"uv run tpo {luminescent_grand_path} --native"
-
-        result = subprocess.run(
-            cmd,
+        # Run the tpo entry point (turbo pio compile) as specified in
+        # pyproject.toml, in-process rather than through ``uv run`` and a shell
+        returncode, stdout, stderr = run_cli(
+            [luminescent_grand_path, "--native"],
             cwd=project_root,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
             timeout=300,  # 5 minute timeout for complex project
         )
 
         # Log output for debugging if the test fails
-        if result.returncode != 0:
-            print("STDOUT:\n", result.stdout)
-            print("STDERR:\n", result.stderr)
+        if returncode != 0:
+            print("STDOUT:\n", stdout)
+            print("STDERR:\n", stderr)
 
         # This test expects the compilation to succeed
-        self.assertEqual(result.returncode, 0, "Compilation failed")
+        self.assertEqual(returncode, 0, "Compilation failed")
 
-        combined_output = result.stdout + result.stderr
+        combined_output = stdout + stderr
         self.assertIn("[BUILD]", combined_output)
         self.assertIn("LuminescentGrand", combined_output)
 
@@ -1,9 +1,10 @@
 import logging
 import shutil
 import subprocess  # local import to avoid polluting global namespace
-import time
 import unittest
+from collections import deque
 from pathlib import Path
+from typing import Deque
 
 from pio_compiler import PioCompiler, Platform
 from pio_compiler.logging_utils import configure_logging
@@ -75,15 +76,13 @@ class UnoCompileTest(unittest.TestCase):
             self._processes.append(stream._popen)
             self.logger.info("Compilation process started")
 
-        # Drain the output stream until compilation is finished.  *is_done()*
-        # returns *True* once the build **completed** and all output has been
-        # consumed.  Loop until it reports completion (i.e. returns *True*).
+        # Drain the output stream until compilation is finished.  Iterating
+        # blocks on the stream and ends once the build exits, so nothing
+        # polls while it compiles.  Only the tail is kept for failure messages.
         self.logger.info("Waiting for compilation to complete...")
-        while not stream.is_done():
-            output = stream.readline(timeout=0.1)
-            if output:
-                self.logger.debug(f"Build output: {output.strip()}")
-            time.sleep(0.01)
+        output_tail: Deque[str] = deque(maxlen=200)
+        for output in stream:
+            output_tail.append(output.rstrip())
         self.logger.info("Compilation completed")
 
         # Persist the work_dir for tearDown so that we can remove it later.
@@ -101,7 +100,10 @@ class UnoCompileTest(unittest.TestCase):
         self.logger.info(f"Looking for firmware artifact at: {artefact_path}")
 
         # 1. File exists   2. File is a regular file   3. File has non-zero size
-        self.assertTrue(artefact_path.exists(), f"{artefact_path} does not exist")
+        self.assertTrue(
+            artefact_path.exists(),
+            f"{artefact_path} does not exist. Build output:\n" + "\n".join(output_tail),
+        )
         self.logger.info("Firmware file exists")
 
         self.assertTrue(
@@ -0,0 +1,82 @@
+"""Unit tests for CompilerStream end-of-output handling."""
+
+import subprocess
+import sys
+import time
+import unittest
+from typing import List
+
+from pio_compiler import CompilerStream
+
+from . import TimedTestCase
+
+
+def _spawn(code: str) -> "subprocess.Popen[bytes]":
+    """Start a Python child running *code* with its output piped like a build."""
+    return subprocess.Popen(
+        [sys.executable, "-c", code],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+
+
+class CompilerStreamTest(TimedTestCase):
+    """Test reading, iterating and polling a CompilerStream."""
+
+    def _poll_until_done(self, stream: CompilerStream, timeout: float = 10) -> bool:
+        """Poll *is_done* without reading, as a ``while`` loop caller would."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if stream.is_done():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_simulation_mode_without_output_is_done(self) -> None:
+        """Test that a stream without process or output is done immediately."""
+        stream = CompilerStream(None)
+
+        self.assertTrue(stream.is_done())
+        self.assertIsNone(stream.readline(timeout=0.1))
+        self.assertEqual(list(stream), [])
+
+    def test_simulation_mode_preloaded_output(self) -> None:
+        """Test that preloaded output is served before the stream reports done."""
+        stream = CompilerStream(None, preloaded_output="first\nsecond\n")
+
+        self.assertFalse(stream.is_done())
+        self.assertEqual(list(stream), ["first\n", "second\n"])
+        self.assertTrue(stream.is_done())
+
+    def test_iteration_stops_when_process_exits(self) -> None:
+        """Test that iterating yields every line and ends at end of output."""
+        stream = CompilerStream(_spawn("print('a'); print('b')"))
+
+        lines: List[str] = [line.rstrip("\r\n") for line in stream]
+
+        self.assertEqual(lines, ["a", "b"])
+        self.assertTrue(stream.is_done())
+        self.assertIsNone(stream.readline(timeout=0.1))
+
+    def test_is_done_without_reading_the_end_marker(self) -> None:
+        """Test that polling alone observes the end of a finished process."""
+        stream = CompilerStream(_spawn("print('only line')"))
+
+        line = stream.readline(timeout=10)
+        self.assertIsNotNone(line)
+        assert line is not None  # type checker hint
+        self.assertEqual(line.rstrip("\r\n"), "only line")
+
+        # The data line was read; the end marker is left for is_done to see
+        self.assertTrue(self._poll_until_done(stream))
+
+    def test_is_done_for_silent_process(self) -> None:
+        """Test that a process without output is reported done by polling."""
+        stream = CompilerStream(_spawn("pass"))
+
+        self.assertTrue(self._poll_until_done(stream))
+        self.assertEqual(list(stream), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
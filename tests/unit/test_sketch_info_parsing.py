@@ -249,6 +249,25 @@ void loop() {
         # Should return empty list for nonexistent path
         self.assertEqual(len(dependencies), 0)
 
+    def test_parse_sketch_dependencies_reparses_modified_file(self) -> None:
+        """Test that editing a sketch invalidates the memoised dependencies."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            sketch = Path(temp_dir) / "sketch.ino"
+            sketch.write_text(
+                '/// SKETCH-INFO\n/// dependencies = ["FastLED"]\n/// SKETCH-INFO\n'
+            )
+            self.assertEqual(_parse_sketch_dependencies(sketch), ["FastLED"])
+
+            # Callers get their own list - mutating it must not leak into the cache
+            _parse_sketch_dependencies(sketch).append("Bogus")
+            self.assertEqual(_parse_sketch_dependencies(sketch), ["FastLED"])
+
+            sketch.write_text(
+                '/// SKETCH-INFO\n/// dependencies = ["FastLED", "SPI"]\n'
+                "/// SKETCH-INFO\n"
+            )
+            self.assertEqual(_parse_sketch_dependencies(sketch), ["FastLED", "SPI"])
+
     def test_cli_argument_parsing_with_sketch_info(self) -> None:
         """Test that CLI argument parsing correctly extracts SKETCH-INFO dependencies."""
         from pio_compiler.cli import _build_argument_parser, _parse_arguments